@@ -5,7 +5,9 @@ Features:
 - Select a video file
 - Uses OpenAI speech-to-text (whisper-1) by default (requires OPENAI_API_KEY)
 - Splits long videos into chunks to handle >30 minutes
-- Translates English -> Traditional Chinese using googletrans
+- Skips long silences so they are not uploaded to (or billed by) Whisper
+- Translates English -> Traditional Chinese offline with an ONNX opus-mt model
+  when one is installed, otherwise using Google Translate (deep-translator)
 - Outputs bilingual SRT (English line, Chinese line)
 - Designed to be packaged into a Windows .exe with PyInstaller
 """
@@ -13,22 +15,27 @@ Features:
 import os
 import sys
 import time
+import random
+import functools
+import asyncio
 import threading
+import queue
 import subprocess
+import io
+import bisect
+import math
+import re
+import hashlib
+import json
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
 
 # Optional dependencies (import at runtime so exe build bundles them)
 try:
-    import moviepy.editor as mpy
+    from deep_translator import GoogleTranslator
 except Exception:
-    mpy = None
-
-try:
-    from googletrans import Translator
-except Exception:
-    Translator = None
+    GoogleTranslator = None
 
 try:
     import openai
@@ -36,125 +43,516 @@ except Exception:
     openai = None
 
 CHUNK_SECONDS = 5 * 60  # 5 minutes per chunk
+CACHE_DIR = Path.home() / ".vma_cache"  # transcription/translation results by content hash
+# exported Helsinki-NLP/opus-mt-en-zh (see README); bundled next to the exe or overridden by env var
+LOCAL_MT_MODEL_DIR = Path(os.environ.get(
+    "VMA_MT_MODEL_DIR",
+    Path(getattr(sys, "_MEIPASS", Path(__file__).resolve().parent)) / "models" / "opus-mt-en-zh",
+))
+# silence skipping: audio is cut into fixed 10ms frames so speech can be selected by frame number
+VAD_FRAME_SECONDS = 0.01
+AUDIO_FRAMES_FILTER = "aresample=16000,asetnsamples=n=160:p=0,asetpts=N/SR/TB"
+SILENCE_NOISE_DB = -35
+SILENCE_MIN_SECONDS = 2.0  # shorter pauses stay in the audio sent to Whisper
+SPEECH_PAD_SECONDS = 0.5  # kept on each side of detected speech
+MIN_SPEECH_FRACTION = 0.01  # less detected speech than this means the threshold missed it
+MAX_CONCURRENT_REQUESTS = 8  # in-flight Whisper uploads, kept under the account rate limit
+RETRY_ATTEMPTS = 6
+RETRY_MAX_WAIT_SECONDS = 60
+TRANSLATE_ATTEMPTS = 4  # per subtitle line, before the whole run fails
+ENCODE_WORKERS = max(1, (os.cpu_count() or 2) // 2)  # concurrent ffmpeg chunk encodes
+ONLINE_MT_MAX_CHARS = 4500  # Google Translate rejects requests over 5000 characters
+LOCAL_MT_BATCH = 32  # sentences per encoder/decoder forward pass
+LOCAL_MT_MAX_TOKENS = 256
+
+# zero-padded strings for every hour/minute/second/millisecond value a timestamp uses
+_PAD2 = [f"{i:02d}" for i in range(100)]
+_PAD3 = [f"{i:03d}" for i in range(1000)]
 
 def seconds_to_srt_timestamp(sec):
-    h = int(sec // 3600)
-    m = int((sec % 3600) // 60)
-    s = int(sec % 60)
-    ms = int((sec - int(sec)) * 1000)
-    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-
-def split_audio(video_path, out_dir):
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    audio_path = out_dir / "full_audio.wav"
-    # use moviepy if available
-    if mpy is not None:
-        clip = mpy.VideoFileClip(str(video_path))
-        clip.audio.write_audiofile(str(audio_path))
-        duration = clip.duration
-        clip.reader.close()
-        clip.audio.reader.close_proc()
+    # split integer milliseconds with divmod instead of repeated float math
+    s, ms = divmod(int(round(sec * 1000)), 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    if h >= 100:
+        return f"{h:02d}:{_PAD2[m]}:{_PAD2[s]},{_PAD3[ms]}"
+    return f"{_PAD2[h]}:{_PAD2[m]}:{_PAD2[s]},{_PAD3[ms]}"
+
+def parse_ffmpeg_duration(stderr):
+    """Read the input duration ffmpeg logs while opening a file, in seconds."""
+    # "Duration: N/A" (some live/streamed containers) falls back to the final progress time
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if match is not None:
+        h, m, s = match.groups()
     else:
-        # fallback: use ffmpeg to extract wav
-        cmd = [
-            "ffmpeg", "-y", "-i", str(video_path),
-            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
-            str(audio_path)
-        ]
-        subprocess.check_call(cmd)
-        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of",
-               "default=noprint_wrappers=1:nokey=1", str(audio_path)]
-        duration = float(subprocess.check_output(cmd).decode().strip())
+        times = re.findall(r"time=\s*(\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+        if not times:
+            raise RuntimeError("Could not determine the video duration")
+        h, m, s = times[-1]
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+def detect_silences(video_path):
+    """Return (silences, duration). Silences are (start, end) in seconds; end is None
+    for silence running to the end of the file."""
+    cmd = [
+        "ffmpeg", "-hide_banner", "-i", str(video_path), "-vn",
+        "-af", f"{AUDIO_FRAMES_FILTER},silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}",
+        "-f", "null", "-"
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace")
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=proc.stderr)
+    silences = []
+    for kind, value in re.findall(r"silence_(start|end): (-?[\d.]+(?:e-?\d+)?)", proc.stderr):
+        if kind == "start":
+            silences.append((max(0.0, float(value)), None))
+        elif silences:
+            silences[-1] = (silences[-1][0], float(value))
+    return silences, parse_ffmpeg_duration(proc.stderr)
+
+def speech_regions(silences, total_frames):
+    """Complement of silences as padded, merged (first_frame, end_frame) pairs."""
+    pad = round(SPEECH_PAD_SECONDS / VAD_FRAME_SECONDS)
+    regions = []
+    speech_start = 0.0
+    for silence_start, silence_end in silences:
+        regions.append((speech_start, silence_start))
+        speech_start = silence_end
+        if speech_start is None:
+            break
+    if speech_start is not None:
+        regions.append((speech_start, total_frames * VAD_FRAME_SECONDS))
+
+    # snap outward to whole frames and merge regions the padding joins
+    merged = []
+    for start, end in regions:
+        if end <= start:
+            continue
+        first = max(0, math.floor(start / VAD_FRAME_SECONDS) - pad)
+        last = min(total_frames, math.ceil(end / VAD_FRAME_SECONDS) + pad)
+        if last <= first:
+            continue
+        if merged and first <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+def speech_to_wall(t, speech_map):
+    """Map a time on the silence-trimmed audio back to the original video timeline."""
+    if not speech_map:
+        return t
+    i = max(0, bisect.bisect_right(speech_map, t, key=lambda r: r[0]) - 1)
+    speech_start, wall_start, wall_end = speech_map[i]
+    return min(wall_start + (t - speech_start), wall_end)
+
+def split_audio(video_path):
+    """Plan CHUNK_SECONDS chunks of the video's speech with long silences removed.
+
+    Returns (chunks, speech_map). Each chunk is (start, end, regions): start/end
+    on the trimmed timeline and the (first_frame, end_frame) speech regions that
+    encode_chunk() stitches together. speech_to_wall(t, speech_map) converts
+    trimmed times back to video time.
+    """
+    silences, duration = detect_silences(video_path)
+    total_frames = math.ceil(duration / VAD_FRAME_SECONDS)
+    regions = speech_regions(silences, total_frames)
+    # a fixed threshold can mistake quiet or badly levelled audio for silence;
+    # rather than drop the speech, transcribe the whole timeline
+    if sum(last - first for first, last in regions) < MIN_SPEECH_FRACTION * total_frames:
+        regions = [(0, total_frames)] if total_frames > 0 else []
+
+    speech_map = []
+    speech_frames = 0
+    for first, last in regions:
+        speech_map.append((speech_frames * VAD_FRAME_SECONDS, first * VAD_FRAME_SECONDS, last * VAD_FRAME_SECONDS))
+        speech_frames += last - first
+
+    # fill each chunk with exactly CHUNK_SECONDS of speech, splitting regions at the boundary
+    chunk_frames = round(CHUNK_SECONDS / VAD_FRAME_SECONDS)
+    chunk_regions = []
+    current, used = [], 0
+    for first, last in regions:
+        while first < last:
+            take = min(last - first, chunk_frames - used)
+            current.append((first, first + take))
+            used += take
+            first += take
+            if used == chunk_frames:
+                chunk_regions.append(current)
+                current, used = [], 0
+    if current:
+        chunk_regions.append(current)
 
     chunks = []
-    idx = 0
-    start = 0.0
-    while start < duration:
-        end = min(duration, start + CHUNK_SECONDS)
-        chunk_path = out_dir / f"chunk_{idx:03d}.wav"
-        # re-encode chunk to ensure compatibility
-        cmd = [
-            "ffmpeg", "-y", "-i", str(audio_path),
-            "-ss", str(start), "-to", str(end),
-            "-ar", "16000", "-ac", "1", "-acodec", "pcm_s16le",
-            str(chunk_path)
-        ]
-        subprocess.check_call(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        chunks.append((float(start), float(end), str(chunk_path)))
-        idx += 1
-        start += CHUNK_SECONDS
-    return chunks
-
-def transcribe_chunk_openai(chunk_path, model="whisper-1", api_key=None):
+    for idx, chunk in enumerate(chunk_regions):
+        start = idx * CHUNK_SECONDS
+        end = start + sum(last - first for first, last in chunk) * VAD_FRAME_SECONDS
+        chunks.append((float(start), float(end), chunk))
+    return chunks, speech_map
+
+def encode_chunk(video_path, regions):
+    """Encode the given speech regions as one in-memory 16kbps opus file."""
+    # seek straight to the chunk, then keep its speech frames by (relative) frame number
+    offset = regions[0][0]
+    select = "+".join(f"between(n,{first - offset},{last - offset - 1})" for first, last in regions)
+    cmd = [
+        "ffmpeg", "-ss", str(offset * VAD_FRAME_SECONDS),
+        "-t", str((regions[-1][1] - offset) * VAD_FRAME_SECONDS), "-i", str(video_path),
+        "-vn", "-af", f"{AUDIO_FRAMES_FILTER},aselect='{select}',asetpts=N/SR/TB",
+        # 16kbps opus keeps uploads ~20x smaller than 16kHz PCM wav
+        "-ar", "16000", "-ac", "1", "-c:a", "libopus", "-b:a", "16k",
+        # bitexact output keeps chunk bytes (and so cache keys) stable across runs
+        "-fflags", "+bitexact", "-flags:a", "+bitexact",
+        "-f", "ogg", "pipe:1"
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=proc.stderr)
+    return proc.stdout
+
+def data_digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def text_digest(text):
+    return data_digest(text.encode("utf-8"))
+
+def cache_load(key):
+    try:
+        with open(CACHE_DIR / f"{key}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def cache_store(key, value):
+    # write-then-rename so an interrupted run never leaves a truncated entry
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_DIR / f"{key}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, CACHE_DIR / f"{key}.json")
+    except OSError:
+        pass
+
+async def transcribe_chunk_openai(audio, client, model="whisper-1", language="en"):
+    cache_key = f"{model}-{language}-{data_digest(audio)}"
+    cached = cache_load(cache_key)
+    if cached is not None:
+        return cached["text"], cached["segments"]
+    # rate limits, timeouts and 5xx are transient; back off with full jitter so
+    # concurrent chunks don't retry in lockstep. Other API errors fail fast
+    retryable = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        f = io.BytesIO(audio)
+        f.name = "chunk.ogg"  # the SDK derives the upload's filename and mime type from this
+        try:
+            # a fixed language skips Whisper's per-request language detection pass
+            res = await client.audio.transcriptions.create(
+                model=model, file=f, language=language, response_format="verbose_json")
+            break
+        except retryable:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            await asyncio.sleep(random.uniform(1, min(RETRY_MAX_WAIT_SECONDS, 2 ** attempt)))
+    text = res.text or ""
+    segments = []
+    for s in getattr(res, "segments", None) or []:
+        # older 1.x SDKs leave verbose fields as plain dicts
+        s = s if isinstance(s, dict) else s.model_dump()
+        segments.append({"start": s.get("start", 0.0), "end": s.get("end", 0.0), "text": s.get("text", "")})
+    cache_store(cache_key, {"text": text, "segments": segments})
+    return text, segments
+
+async def transcribe_chunks(video_path, chunks, api_key, on_chunk_done, stop=None):
+    """Encode and transcribe all chunks concurrently, calling on_chunk_done(idx, start, segments) as each finishes.
+
+    Setting the optional threading.Event stop fails the run before any further
+    chunk is encoded or uploaded.
+    """
     if openai is None:
         raise RuntimeError("openai library not installed")
-    if api_key is None:
+    if not api_key:
         raise RuntimeError("OpenAI API key not set")
-    openai.api_key = api_key
-    with open(chunk_path, "rb") as f:
+    # encoding is CPU-bound; leave headroom so parallel ffmpegs don't thrash the disk
+    encode_slots = asyncio.Semaphore(ENCODE_WORKERS)
+    request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    # retries are handled in transcribe_chunk_openai, so turn off the SDK's own
+    async with openai.AsyncOpenAI(api_key=api_key, max_retries=0) as client:
+        def check_stop():
+            if stop is not None and stop.is_set():
+                raise RuntimeError("Transcription stopped")
+
+        async def run(idx, start, regions):
+            async with encode_slots:
+                check_stop()
+                audio = await asyncio.to_thread(encode_chunk, video_path, regions)
+            async with request_slots:
+                check_stop()
+                text, segments = await transcribe_chunk_openai(audio, client)
+            on_chunk_done(idx, start, segments)
+
+        await asyncio.gather(*(run(idx, start, regions) for idx, (start, end, regions) in enumerate(chunks)))
+
+class LocalTranslator:
+    """Offline opus-mt-en-zh on ONNX Runtime, with the same translate_batch() shape as OnlineTranslator."""
+
+    cache_prefix = "opus-mt-zh-tw"
+
+    def __init__(self, model_dir):
+        # imported here so launches without a local model skip loading transformers
+        import onnxruntime as ort
+        from transformers import MarianTokenizer
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        providers = ["CPUExecutionProvider"]
+        self.tokenizer = MarianTokenizer.from_pretrained(str(model_dir))
+        self.encoder = ort.InferenceSession(str(model_dir / "encoder_model.onnx"), options, providers=providers)
+        self.decoder = ort.InferenceSession(str(model_dir / "decoder_model.onnx"), options, providers=providers)
+        self.decoder_with_past = ort.InferenceSession(
+            str(model_dir / "decoder_with_past_model.onnx"), options, providers=providers)
+
+    def translate_batch(self, texts):
+        results = []
+        for i in range(0, len(texts), LOCAL_MT_BATCH):
+            results.extend(self._translate_batch(texts[i:i + LOCAL_MT_BATCH]))
+        return results
+
+    def _translate_batch(self, texts):
+        import numpy as np
+
+        # opus-mt-en-zh is multi-target; the language token selects Traditional Chinese
+        enc = self.tokenizer([f">>cmn_Hant<< {t}" for t in texts], return_tensors="np",
+                             padding=True, truncation=True)
+        input_ids = enc["input_ids"].astype(np.int64)
+        attention_mask = enc["attention_mask"].astype(np.int64)
+        hidden = self.encoder.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+        # greedy decoding over the whole batch at once. The first step runs the plain
+        # decoder; later steps feed back its present.* key/value cache so each step
+        # only processes the newest token instead of the whole prefix
+        pad_id = self.tokenizer.pad_token_id
+        eos_id = self.tokenizer.eos_token_id
+        decoded = np.full((len(texts), 1), pad_id, dtype=np.int64)
+        finished = np.zeros(len(texts), dtype=bool)
+        session = self.decoder
+        feeds = {"input_ids": decoded, "encoder_attention_mask": attention_mask, "encoder_hidden_states": hidden}
+        past = {}
+        for _ in range(LOCAL_MT_MAX_TOKENS):
+            outputs = session.run(None, {i.name: feeds[i.name] for i in session.get_inputs()})
+            outputs = dict(zip((o.name for o in session.get_outputs()), outputs))
+            # the with-past decoder only returns the decoder self-attention cache;
+            # the cross-attention entries from the first step are kept as they are
+            past.update((name.replace("present", "past_key_values", 1), value)
+                        for name, value in outputs.items() if name.startswith("present"))
+            logits = outputs["logits"][:, -1, :]
+            logits[:, pad_id] = -np.inf
+            next_ids = logits.argmax(axis=-1)
+            next_ids[finished] = pad_id
+            decoded = np.concatenate([decoded, next_ids[:, None]], axis=1)
+            finished |= next_ids == eos_id
+            if finished.all():
+                break
+            session = self.decoder_with_past
+            feeds = {"input_ids": next_ids[:, None].astype(np.int64), "encoder_attention_mask": attention_mask,
+                     "encoder_hidden_states": hidden, **past}
+        return self.tokenizer.batch_decode(decoded, skip_special_tokens=True)
+
+class OnlineTranslator:
+    """Google Translate through deep-translator, packing many lines into each request."""
+
+    cache_prefix = "zh-tw"
+
+    def __init__(self):
+        self.google = GoogleTranslator(source="en", target="zh-TW")
+
+    def translate_batch(self, texts):
+        """Return one translation per text, or None where that text failed."""
+        results = [None] * len(texts)
+        # deep-translator's own translate_batch is one request per line; instead send
+        # newline-joined lines up to the per-request size limit and split the reply
+        start = 0
+        while start < len(texts):
+            end, size = start + 1, len(texts[start])
+            while end < len(texts) and size + 1 + len(texts[end]) <= ONLINE_MT_MAX_CHARS:
+                size += 1 + len(texts[end])
+                end += 1
+            batch = [t.replace("\n", " ") for t in texts[start:end]]
+            try:
+                lines = self.google.translate("\n".join(batch)).split("\n")
+            except Exception:
+                lines = None
+            if lines is not None and len(lines) == len(batch):
+                results[start:end] = [line.strip() for line in lines]
+            elif len(batch) > 1:
+                # the reply merged or split lines (or the request failed); go line by line
+                for i, text in enumerate(batch, start=start):
+                    try:
+                        results[i] = self.google.translate(text)
+                    except Exception:
+                        pass
+            start = end
+        return results
+
+@functools.lru_cache(maxsize=1)
+def get_translator():
+    """Build the translator once per process; callers share it via translate_texts.
+
+    Returns (translator, local_error): translator is None when no backend is
+    usable, and local_error is why an installed local model failed to load.
+    """
+    local_error = None
+    if (LOCAL_MT_MODEL_DIR / "encoder_model.onnx").exists():
+        # a half-installed model (missing sentencepiece, tokenizer files, ...) falls
+        # back to the online translator like a missing package does
         try:
-            res = openai.Audio.transcribe(model, f)
-            text = res.get("text") or ""
-            segments = res.get("segments") or []
-            return text, segments
+            return LocalTranslator(LOCAL_MT_MODEL_DIR), None
+        except Exception as e:
+            local_error = e
+    if GoogleTranslator is not None:
+        return OnlineTranslator(), local_error
+    return None, local_error
+
+_translation_cache = {}  # english text -> translated text
+_translator_lock = threading.Lock()  # the translator is shared process-wide; serialize calls into it
+
+def translate_texts(texts, translator):
+    """Translate a list of strings, sending each distinct uncached text once.
+
+    Lines that still fail after TRANSLATE_ATTEMPTS tries raise RuntimeError
+    rather than leaving English in the Chinese line.
+    """
+    prefix = getattr(translator, "cache_prefix", "zh-tw")
+    pending = []
+    for t in sorted({t for t in texts if t and t not in _translation_cache}):
+        cached = cache_load(f"{prefix}-{text_digest(t)}")
+        if cached is not None:
+            _translation_cache[t] = cached
+        else:
+            pending.append(t)
+    for attempt in range(TRANSLATE_ATTEMPTS):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(random.uniform(1, min(RETRY_MAX_WAIT_SECONDS, 2 ** attempt)))
+        try:
+            with _translator_lock:
+                results = translator.translate_batch(pending)
         except Exception:
-            # try alternate method if SDK version differs
-            res = openai.Transcription.create(file=f, model=model)
-            text = res.get("text") or ""
-            segments = res.get("segments") or []
-            return text, segments
+            results = []
+        failed = []
+        for src, res in zip(pending, results + [None] * (len(pending) - len(results))):
+            if res:
+                _translation_cache[src] = res
+                cache_store(f"{prefix}-{text_digest(src)}", res)
+            else:
+                failed.append(src)
+        pending = failed
+    if pending:
+        raise RuntimeError(
+            f"Could not translate {len(pending)} subtitle line(s); check your network connection and try again."
+        )
+    return [_translation_cache.get(t, t) for t in texts]
 
-def translate_text(text, translator):
-    if translator is None:
-        return text
-    try:
-        return translator.translate(text, src="en", dest="zh-tw").text
-    except Exception:
-        return text
-
-def segments_to_srt(all_segments, srt_path):
-    with open(srt_path, "w", encoding="utf-8") as f:
-        for i, seg in enumerate(all_segments, start=1):
-            start_ts = seconds_to_srt_timestamp(seg["start"])
-            end_ts = seconds_to_srt_timestamp(seg["end"])
-            eng = seg["text"].strip()
-            chi = seg.get("zh", "").strip()
-            f.write(f"{i}\n{start_ts} --> {end_ts}\n{eng}\n{chi}\n\n")
+def append_segments_to_srt(f, idx, segments):
+    """Write segments to an open SRT file numbering from idx; returns the next index."""
+    # format everything first and hand the file a single string
+    f.write("".join(
+        f"{i}\n{seconds_to_srt_timestamp(seg['start'])} --> {seconds_to_srt_timestamp(seg['end'])}\n"
+        f"{seg['text'].strip()}\n{seg.get('zh', '').strip()}\n\n"
+        for i, seg in enumerate(segments, start=idx)
+    ))
+    return idx + len(segments)
 
 def process_file(video_path, api_key, use_openai=True, output_dir=None, progress_callback=None):
     video_path = Path(video_path)
     output_dir = Path(output_dir or video_path.parent)
-    work_dir = output_dir / (video_path.stem + "_work")
-    work_dir.mkdir(parents=True, exist_ok=True)
-    chunks = split_audio(video_path, work_dir)
-    translator = Translator() if Translator is not None else None
+    if not use_openai:
+        raise RuntimeError("Local transcription mode not implemented in this package.")
+    # fail up front rather than writing the English text into every Chinese line
+    translator, local_error = get_translator()
+    if translator is None:
+        message = "No translator available: install deep-translator (pip install -r requirements.txt)"
+        if local_error is not None:
+            message += f"\nThe local translation model failed to load: {local_error!r}"
+        raise RuntimeError(message)
+    if local_error is not None and progress_callback:
+        progress_callback(f"Local translation model failed to load ({local_error!r}); using Google Translate")
+    chunks, speech_map = split_audio(video_path)
+
+    # translate each chunk as soon as its transcription lands, so the two
+    # network-bound stages overlap instead of running back to back. Chunks can
+    # finish out of order; hold early ones back so the SRT is written in order
+    srt_path = output_dir / (video_path.stem + ".srt")
+    # stream into a side file so a failed re-run leaves the previous SRT intact
+    part_path = srt_path.with_name(srt_path.name + ".part")
+    transcribed = queue.Queue()
+    worker_errors = []
+    worker_failed = threading.Event()  # stops the remaining encodes/uploads
+
+    def translate_worker(f):
+        try:
+            _translate_and_write(f)
+        except Exception as e:
+            worker_errors.append(e)
+            worker_failed.set()
+
+    def _translate_and_write(f):
+        ready = {}
+        next_chunk = 0
+        next_idx = 1
+        while True:
+            item = transcribed.get()
+            if item is None:
+                break
+            chunk_idx, start, segments = item
+            chunk_segments = [
+                {"start": speech_to_wall(start + s.get("start", 0.0), speech_map),
+                 "end": speech_to_wall(start + s.get("end", 0.0), speech_map),
+                 "text": s.get("text", "").strip()}
+                for s in segments
+            ]
+            texts = [seg["text"] for seg in chunk_segments]
+            translations = translate_texts(texts, translator)
+            for seg, chi_text in zip(chunk_segments, translations):
+                seg["zh"] = chi_text
+            ready[chunk_idx] = chunk_segments
+            while next_chunk in ready:
+                next_idx = append_segments_to_srt(f, next_idx, ready.pop(next_chunk))
+                next_chunk += 1
+            f.flush()
 
-    all_segments = []
+    # transcription is network-bound, so upload all chunks concurrently
     total_chunks = len(chunks)
-    for idx, (start, end, chunk_path) in enumerate(chunks):
-        if progress_callback:
-            progress_callback(f"Transcribing chunk {idx+1}/{total_chunks}...")
-        if use_openai:
-            text, segments = transcribe_chunk_openai(chunk_path, api_key=api_key)
-            if segments:
-                for s in segments:
-                    seg_start = start + s.get("start", 0.0)
-                    seg_end = start + s.get("end", 0.0)
-                    eng_text = s.get("text", "").strip()
-                    chi_text = translate_text(eng_text, translator)
-                    all_segments.append({"start": seg_start, "end": seg_end, "text": eng_text, "zh": chi_text})
-            else:
-                eng_text = text.strip()
-                chi_text = translate_text(eng_text, translator)
-                all_segments.append({"start": start, "end": end, "text": eng_text, "zh": chi_text})
-        else:
-            raise RuntimeError("Local transcription mode not implemented in this package.")
+    finished_chunks = 0
+
+    def on_chunk_done(chunk_idx, start, segments):
+        nonlocal finished_chunks
+        if worker_failed.is_set():
+            raise worker_errors[0]
+        transcribed.put((chunk_idx, start, segments))
+        finished_chunks += 1
         if progress_callback:
-            progress_callback(f"Finished chunk {idx+1}/{total_chunks}")
-    all_segments.sort(key=lambda x: x["start"])
-    srt_path = output_dir / (video_path.stem + ".srt")
-    segments_to_srt(all_segments, srt_path)
+            progress_callback(f"Finished chunk {finished_chunks}/{total_chunks}")
+
+    if progress_callback:
+        progress_callback(f"Transcribing {total_chunks} chunks...")
+    with open(part_path, "w", encoding="utf-8") as srt_file:
+        worker = threading.Thread(target=translate_worker, args=(srt_file,), daemon=True)
+        worker.start()
+        try:
+            asyncio.run(transcribe_chunks(video_path, chunks, api_key, on_chunk_done, worker_failed))
+        except Exception:
+            # report why the worker died, not the stop it triggered
+            if not worker_errors:
+                raise
+        finally:
+            transcribed.put(None)
+            worker.join()
+    if worker_errors:
+        raise worker_errors[0]
+    os.replace(part_path, srt_path)
     return srt_path
 
 # Simple Tkinter GUI